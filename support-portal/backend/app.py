@@ -20,23 +20,26 @@ import sys
 import json
 import uuid
 import base64
+import shutil
 import sqlite3
 import traceback
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from dataclasses import dataclass, asdict
 
 # FastAPI imports with error handling
 try:
     from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form
+    from fastapi.concurrency import run_in_threadpool
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
+    from fastapi.responses import JSONResponse, ORJSONResponse
     from pydantic import BaseModel
+    import orjson
     import uvicorn
 except ImportError as e:
     print(f"❌ Missing FastAPI dependencies: {e}")
-    print("Install with: pip install fastapi uvicorn python-multipart")
+    print("Install with: pip install fastapi uvicorn python-multipart orjson")
     sys.exit(1)
 
 # AWS and other optional imports
@@ -56,8 +59,12 @@ except ImportError:
 
 # Import shared components
 from shared import (
-    Config, DatabaseManager, StorageManager, TicketRepository,
-    create_error_response, ApiResponse, Ticket
+    Config, DatabaseManager, StorageManager, get_database_manager,
+    create_error_response, ApiResponse, Ticket, TTLCache, logger
+)
+from repositories import (
+    ExtendedTicketRepository, CommentRepository, TicketFileRepository,
+    DEMO_COMMENT_TEXT
 )
 
 # Ensure upload folder exists
@@ -86,281 +93,44 @@ class CreateTicketRequest(BaseModel):
     priority: str
     category: str
     description: str
-    attachment: Optional[str] = None
+    # Kept as raw bytes so the data: URL header is skipped without a text copy
+    attachment: Optional[bytes] = None
     attachment_name: Optional[str] = None
     attachment_type: Optional[str] = None
 
 class CreateCommentRequest(BaseModel):
     comment: str
 
-# Extended Repository Classes
-class ExtendedTicketRepository(TicketRepository):
-    def __init__(self):
-        self.s3_client = None
-        if HAS_BOTO3 and Config.AWS_ACCESS_KEY_ID and Config.S3_BUCKET_NAME:
-            try:
-                self.s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY,
-                    region_name=Config.AWS_REGION
-                )
-                print("✅ S3 client initialized")
-            except Exception as e:
-                print(f"⚠️ S3 initialization failed: {e}")
-    
-    def upload_file(self, file_data: str, file_name: str, file_type: str = None):
-        """Upload file to S3 or local storage"""
-        try:
-            # Decode base64 file data
-            if ',' in file_data:
-                file_data = file_data.split(',', 1)[1]
-            
-            file_bytes = base64.b64decode(file_data)
-            file_size = len(file_bytes)
-            
-            # Check file size
-            if file_size > Config.MAX_FILE_SIZE:
-                raise ValueError(f"File size ({file_size}) exceeds limit ({Config.MAX_FILE_SIZE})")
-            
-            # Generate unique filename
-            unique_filename = f"{uuid.uuid4()}_{file_name}"
-            
-            # Try S3 upload first
-            if self.s3_client and Config.S3_BUCKET_NAME:
-                try:
-                    self.s3_client.put_object(
-                        Bucket=Config.S3_BUCKET_NAME,
-                        Key=unique_filename,
-                        Body=file_bytes,
-                        ContentType=file_type or 'application/octet-stream'
-                    )
-                    file_url = f"https://{Config.S3_BUCKET_NAME}.s3.{Config.AWS_REGION}.amazonaws.com/{unique_filename}"
-                    print(f"✅ File uploaded to S3: {file_url}")
-                    return file_url, file_size
-                except Exception as e:
-                    print(f"⚠️ S3 upload failed, falling back to local storage: {e}")
-            
-            # Fallback to local storage
-            local_path = Path(Config.UPLOAD_FOLDER) / unique_filename
-            with open(local_path, 'wb') as f:
-                f.write(file_bytes)
-            
-            file_url = f"/uploads/{unique_filename}"
-            print(f"✅ File saved locally: {file_url}")
-            return file_url, file_size
-            
-        except Exception as e:
-            print(f"❌ File upload failed: {e}")
-            raise HTTPException(status_code=400, detail=f"File upload failed: {str(e)}")
-
-# Repository Classes
-class TicketRepository:
-    def __init__(self, db_manager: DatabaseManager):
-        self.db = db_manager
-    
-    def create_ticket(self, subject: str, priority: str, category: str, 
-                     description: str, user_id: str, attachment_url: str = None) -> Ticket:
-        """Create a new ticket"""
-        ticket_id = str(uuid.uuid4())
-        created_at = datetime.now(timezone.utc).isoformat()
-        
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO tickets (id, subject, priority, category, description, 
-                                   status, user_id, created_at, attachment_url)
-                VALUES (?, ?, ?, ?, ?, 'open', ?, ?, ?)
-            """, (ticket_id, subject, priority, category, description, user_id, created_at, attachment_url))
-            conn.commit()
-        
-        return Ticket(
-            id=ticket_id,
-            subject=subject,
-            priority=priority,
-            category=category,
-            description=description,
-            status='open',
-            user_id=user_id,
-            created_at=created_at,
-            attachment_url=attachment_url
-        )
-    
-    def get_my_tickets(self, user_id: str) -> List[Dict]:
-        """Get all tickets for a user"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, subject, priority, category, description, status, 
-                       user_id, created_at, attachment_url
-                FROM tickets WHERE user_id = ? ORDER BY created_at DESC
-            """, (user_id,))
-            
-            tickets = []
-            for row in cursor.fetchall():
-                tickets.append({
-                    'id': row[0],
-                    'subject': row[1],
-                    'priority': row[2],
-                    'category': row[3],
-                    'description': row[4],
-                    'status': row[5],
-                    'user_id': row[6],
-                    'created_at': row[7],
-                    'attachment_url': row[8]
-                })
-            return tickets
-    
-    def get_ticket(self, ticket_id: str, user_id: str = None) -> Optional[Dict]:
-        """Get a specific ticket"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            query = """
-                SELECT id, subject, priority, category, description, status, 
-                       user_id, created_at, attachment_url
-                FROM tickets WHERE id = ?
-            """
-            params = [ticket_id]
-            
-            if user_id:
-                query += " AND user_id = ?"
-                params.append(user_id)
-            
-            cursor.execute(query, params)
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    'id': row[0],
-                    'subject': row[1],
-                    'priority': row[2],
-                    'category': row[3],
-                    'description': row[4],
-                    'status': row[5],
-                    'user_id': row[6],
-                    'created_at': row[7],
-                    'attachment_url': row[8]
-                }
-            return None
-    
-    def get_dashboard_metrics(self, user_id: str = None) -> Dict[str, int]:
-        """Get dashboard metrics"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            base_query = "SELECT COUNT(*) FROM tickets"
-            where_clause = " WHERE user_id = ?" if user_id else ""
-            params = [user_id] if user_id else []
-            
-            # Total tickets
-            cursor.execute(base_query + where_clause, params)
-            total = cursor.fetchone()[0]
-            
-            # Open tickets  
-            cursor.execute(base_query + where_clause + (" AND" if user_id else " WHERE") + " status IN ('open', 'in_progress')", params)
-            open_tickets = cursor.fetchone()[0]
-            
-            # Resolved tickets
-            cursor.execute(base_query + where_clause + (" AND" if user_id else " WHERE") + " status IN ('resolved', 'closed')", params)
-            resolved = cursor.fetchone()[0]
-            
-            return {
-                'total': total,
-                'open': open_tickets, 
-                'resolved': resolved
-            }
-
-class CommentRepository:
-    def __init__(self, db_manager: DatabaseManager):
-        self.db = db_manager
-    
-    def get_comments_for_ticket(self, ticket_id: str) -> List[Dict]:
-        """Get all comments for a ticket"""
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, ticket_id, user_id, comment, created_at
-                FROM comments WHERE ticket_id = ? ORDER BY created_at ASC
-            """, (ticket_id,))
-            
-            comments = []
-            for row in cursor.fetchall():
-                comments.append({
-                    'id': row[0],
-                    'ticket_id': row[1],
-                    'user_id': row[2],
-                    'comment': row[3],
-                    'created_at': row[4]
-                })
-            return comments
-    
-    def create_comment(self, ticket_id: str, user_id: str, comment_text: str):
-        """Create a new comment for a ticket"""
-        comment_id = str(uuid.uuid4())
-        created_at = datetime.now(timezone.utc).isoformat()
-        
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO comments (id, ticket_id, user_id, comment, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (comment_id, ticket_id, user_id, comment_text, created_at))
-            conn.commit()
-            
-        return {
-            'id': comment_id,
-            'ticket_id': ticket_id,
-            'user_id': user_id,
-            'comment': comment_text,
-            'created_at': created_at
-        }
-    
-    def create_demo_comment(self, ticket_id: str, user_id: str):
-        """Create a demo comment for development"""
-        comment_text = "Thank you for submitting your ticket. We've received your request and will respond within 24 hours."
-        return self.create_comment(ticket_id, 'support-team', comment_text)
-
-class TicketFileRepository:
-    def __init__(self, db_manager: DatabaseManager):
-        self.db = db_manager
-    
-    def save_ticket_file(self, ticket_id: str, file_url: str, file_name: str):
-        """Save ticket file record"""
-        file_id = str(uuid.uuid4())
-        created_at = datetime.now(timezone.utc).isoformat()
-        
-        with self.db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO ticket_files (id, ticket_id, file_url, file_name, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (file_id, ticket_id, file_url, file_name, created_at))
-            conn.commit()
+ALLOWED_PRIORITIES = frozenset(("low", "medium", "high", "P1"))
 
 # Initialize components
-db_manager = DatabaseManager()
+db_manager = get_database_manager()
 storage_manager = StorageManager()
-ticket_repo = TicketRepository(db_manager)
+ticket_repo = ExtendedTicketRepository(db_manager)
 comment_repo = CommentRepository(db_manager)
 file_repo = TicketFileRepository(db_manager)
 
+# Short-lived per-user cache for dashboard polling; keys must include user_id
+response_cache = TTLCache(maxsize=10_000, ttl=5)
+
 # FastAPI app
 app = FastAPI(
     title="Support Portal API",
     description="Standalone Support Portal Backend - AWS Lambda Ready",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=Config.CORS_ORIGINS,
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "X-User-Id", "Authorization"],
+    max_age=86400,  # let browsers reuse the preflight for a day
 )
 
 # Helper functions
@@ -395,63 +165,124 @@ def health_check():
     """Health check endpoint"""
     return {"status": "ok", "timestamp": datetime.now(timezone.utc).isoformat()}
 
+def validate_ticket_fields(subject: str, priority: str, category: str, description: str):
+    """Reject missing fields and unknown priorities"""
+    if not (subject and priority and category and description):
+        raise create_error_response("Missing required fields")
+    
+    if priority not in ALLOWED_PRIORITIES:
+        raise create_error_response("Invalid priority. Must be: low, medium, high, or P1")
+
+async def save_ticket(user_id: str, subject: str, priority: str, category: str, description: str,
+                      attachment_url: str = None, attachment_name: str = None) -> Dict:
+    """Persist a ticket with its file record and demo comment"""
+    # All rows are written in a single transaction, in the threadpool
+    # rather than on the event loop
+    ticket = await run_in_threadpool(
+        ticket_repo.create_ticket_bundle,
+        subject=subject,
+        priority=priority,
+        category=category,
+        description=description,
+        user_id=user_id,
+        attachment_url=attachment_url,
+        attachment_name=attachment_name,
+        demo_comment=DEMO_COMMENT_TEXT
+    )
+    
+    response_cache.delete(f"metrics:{user_id}")
+    response_cache.delete(f"mytix:{user_id}")
+    
+    logger.info("✅ Ticket created: %s", ticket.id)
+    return {"ticket": asdict(ticket)}
+
 @app.post("/tickets")
 async def create_ticket(request: Request, ticket_data: CreateTicketRequest):
-    """Create a new ticket with optional file attachment"""
+    """Create a new ticket with optional base64 file attachment"""
     try:
         user_id = get_user_id(request)
-        
-        # Validate required fields
-        if not all([ticket_data.subject, ticket_data.priority, ticket_data.category, ticket_data.description]):
-            raise create_error_response("Missing required fields")
-        
-        # Validate priority
-        if ticket_data.priority not in ["low", "medium", "high", "P1"]:
-            raise create_error_response("Invalid priority. Must be: low, medium, high, or P1")
+        validate_ticket_fields(ticket_data.subject, ticket_data.priority, ticket_data.category, ticket_data.description)
         
         attachment_url = None
         
         # Handle file attachment if provided
         if ticket_data.attachment and ticket_data.attachment_name:
             try:
-                attachment_url, file_size = storage_manager.upload_file(
+                attachment_url, file_size = await run_in_threadpool(
+                    storage_manager.upload_file,
                     ticket_data.attachment,
                     ticket_data.attachment_name,
                     ticket_data.attachment_type
                 )
-                print(f"✅ File uploaded: {attachment_url} ({file_size} bytes)")
+                logger.info("✅ File uploaded: %s (%s bytes)", attachment_url, file_size)
             except Exception as e:
-                print(f"❌ File upload failed: {e}")
+                logger.error("❌ File upload failed: %s", e)
                 raise create_error_response(f"File upload failed: {str(e)}")
         
-        # Create ticket
-        ticket = ticket_repo.create_ticket(
-            subject=ticket_data.subject,
-            priority=ticket_data.priority,
-            category=ticket_data.category,
-            description=ticket_data.description,
-            user_id=user_id,
-            attachment_url=attachment_url
+        return await save_ticket(
+            user_id,
+            ticket_data.subject,
+            ticket_data.priority,
+            ticket_data.category,
+            ticket_data.description,
+            attachment_url=attachment_url,
+            attachment_name=ticket_data.attachment_name
         )
         
-        # Save file record if attachment exists
-        if attachment_url:
-            file_repo.save_ticket_file(
-                ticket_id=ticket.id,
-                file_url=attachment_url,
-                file_name=ticket_data.attachment_name
-            )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("❌ Create ticket error: %s", e)
+        raise create_error_response(f"Failed to create ticket: {str(e)}", 500)
+
+@app.post("/tickets/upload")
+async def create_ticket_multipart(
+    request: Request,
+    subject: str = Form(...),
+    priority: str = Form(...),
+    category: str = Form(...),
+    description: str = Form(...),
+    attachment: Optional[UploadFile] = File(None)
+):
+    """Create a new ticket from multipart/form-data, streaming the attachment"""
+    try:
+        user_id = get_user_id(request)
+        validate_ticket_fields(subject, priority, category, description)
         
-        # Create demo comment for development
-        comment_repo.create_demo_comment(ticket.id, user_id)
+        attachment_url = None
+        attachment_name = None
+        
+        # Starlette has already spooled the part to a temp file; stream it on
+        if attachment and attachment.filename:
+            attachment_name = attachment.filename
+            try:
+                attachment_url, file_size = await run_in_threadpool(
+                    storage_manager.upload_fileobj,
+                    attachment.file,
+                    attachment_name,
+                    attachment.content_type
+                )
+                logger.info("✅ File uploaded: %s (%s bytes)", attachment_url, file_size)
+            except Exception as e:
+                logger.error("❌ File upload failed: %s", e)
+                raise create_error_response(f"File upload failed: {str(e)}")
+            finally:
+                await attachment.close()
         
-        print(f"✅ Ticket created: {ticket.id}")
-        return {"ticket": asdict(ticket)}
+        return await save_ticket(
+            user_id,
+            subject,
+            priority,
+            category,
+            description,
+            attachment_url=attachment_url,
+            attachment_name=attachment_name
+        )
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Create ticket error: {e}")
+        logger.error("❌ Create ticket error: %s", e)
         raise create_error_response(f"Failed to create ticket: {str(e)}", 500)
 
 @app.get("/tickets/my")
@@ -459,14 +290,17 @@ async def get_my_tickets(request: Request):
     """Get all tickets for the current user"""
     try:
         user_id = get_user_id(request)
-        tickets = ticket_repo.get_my_tickets(user_id)
-        print(f"✅ Fetched {len(tickets)} tickets for user {user_id}")
+        tickets = response_cache.get(f"mytix:{user_id}")
+        if tickets is None:
+            tickets = await run_in_threadpool(ticket_repo.get_my_tickets, user_id)
+            response_cache.set(f"mytix:{user_id}", tickets)
+        logger.info("✅ Fetched %s tickets for user %s", len(tickets), user_id)
         return {"tickets": tickets}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Get my tickets error: {e}")
+        logger.error("❌ Get my tickets error: %s", e)
         raise create_error_response(f"Failed to fetch tickets: {str(e)}", 500)
 
 @app.get("/tickets/{ticket_id}")
@@ -474,30 +308,30 @@ async def get_ticket(ticket_id: str, request: Request):
     """Get a specific ticket"""
     try:
         user_id = get_user_id(request)
-        ticket = ticket_repo.get_ticket(ticket_id, user_id)
+        ticket = await run_in_threadpool(ticket_repo.get_ticket, ticket_id, user_id)
         
         if not ticket:
             raise create_error_response("Ticket not found", 404)
         
-        print(f"✅ Fetched ticket: {ticket_id}")
+        logger.info("✅ Fetched ticket: %s", ticket_id)
         return {"ticket": ticket}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Get ticket error: {e}")
+        logger.error("❌ Get ticket error: %s", e)
         raise create_error_response(f"Failed to fetch ticket: {str(e)}", 500)
 
 @app.get("/tickets/{ticket_id}/comments")
 async def get_ticket_comments(ticket_id: str):
     """Get all comments for a ticket"""
     try:
-        comments = comment_repo.get_comments_for_ticket(ticket_id)
-        print(f"✅ Fetched {len(comments)} comments for ticket {ticket_id}")
+        comments = await run_in_threadpool(comment_repo.get_comments_for_ticket, ticket_id)
+        logger.info("✅ Fetched %s comments for ticket %s", len(comments), ticket_id)
         return {"comments": comments}
         
     except Exception as e:
-        print(f"❌ Get comments error: {e}")
+        logger.error("❌ Get comments error: %s", e)
         raise create_error_response(f"Failed to fetch comments: {str(e)}", 500)
 
 @app.post("/tickets/{ticket_id}/comments")
@@ -511,14 +345,19 @@ async def create_ticket_comment(request: Request, ticket_id: str, comment_data:
             raise create_error_response("Comment cannot be empty")
         
         # Create comment
-        comment = comment_repo.create_comment(ticket_id, user_id, comment_data.comment.strip())
-        print(f"✅ Comment created for ticket {ticket_id} by {user_id}")
+        comment = await run_in_threadpool(
+            comment_repo.create_comment, ticket_id, user_id, comment_data.comment.strip()
+        )
+        logger.info("✅ Comment created for ticket %s by %s", ticket_id, user_id)
         return {"comment": comment}
         
     except HTTPException:
         raise
+    except sqlite3.IntegrityError:
+        # foreign_keys=ON rejects comments whose ticket_id has no ticket row
+        raise create_error_response("Ticket not found", 404)
     except Exception as e:
-        print(f"❌ Create comment error: {e}")
+        logger.error("❌ Create comment error: %s", e)
         raise create_error_response(f"Failed to create comment: {str(e)}", 500)
 
 @app.get("/dashboard/metrics")
@@ -526,14 +365,17 @@ async def get_dashboard_metrics(request: Request):
     """Get dashboard metrics for the current user"""
     try:
         user_id = get_user_id(request)
-        metrics = ticket_repo.get_dashboard_metrics(user_id)
-        print(f"✅ Dashboard metrics for {user_id}: {metrics}")
+        metrics = response_cache.get(f"metrics:{user_id}")
+        if metrics is None:
+            metrics = await run_in_threadpool(ticket_repo.get_dashboard_metrics, user_id)
+            response_cache.set(f"metrics:{user_id}", metrics)
+        logger.info("✅ Dashboard metrics for %s: %s", user_id, metrics)
         return {"metrics": metrics}
         
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Get metrics error: {e}")
+        logger.error("❌ Get metrics error: %s", e)
         raise create_error_response(f"Failed to fetch metrics: {str(e)}", 500)
 
 # P1 Critical tickets are now handled through regular tickets with priority='P1'
@@ -541,8 +383,7 @@ async def get_dashboard_metrics(request: Request):
 # Error handlers
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    print(f"❌ Unhandled error: {exc}")
-    print(traceback.format_exc())
+    logger.error("❌ Unhandled error: %s", exc, exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={
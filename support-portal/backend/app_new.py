@@ -12,7 +12,9 @@ import sys
 import json
 import uuid
 import base64
+import hashlib
 import sqlite3
+import subprocess
 import traceback
 from pathlib import Path
 from datetime import datetime, timezone
@@ -22,15 +24,37 @@ from dataclasses import dataclass, asdict
 # FastAPI imports
 try:
     from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form
+    from fastapi.concurrency import run_in_threadpool
     from fastapi.middleware.cors import CORSMiddleware
-    from fastapi.responses import JSONResponse
+    from fastapi.responses import JSONResponse, ORJSONResponse, Response
     from pydantic import BaseModel
+    import orjson
     import uvicorn
 except ImportError as e:
     print(f"❌ Missing FastAPI dependencies: {e}")
-    print("Install with: pip install fastapi uvicorn python-multipart")
+    print("Install with: pip install fastapi uvicorn python-multipart orjson")
     sys.exit(1)
 
+# Faster event loop and HTTP parser (installed by uvicorn[standard])
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False  # not available on Windows
+
+try:
+    import httptools
+    HAS_HTTPTOOLS = True
+except ImportError:
+    HAS_HTTPTOOLS = False
+
+# Gunicorn process manager (POSIX only)
+try:
+    import gunicorn
+    HAS_GUNICORN = os.name != "nt"
+except ImportError:
+    HAS_GUNICORN = False
+
 # Load environment variables
 try:
     from dotenv import load_dotenv
@@ -40,8 +64,8 @@ except ImportError:
 
 # Import shared components
 from shared import (
-    Config, DatabaseManager, StorageManager, TicketRepository,
-    create_error_response, ApiResponse, Ticket
+    Config, DatabaseManager, StorageManager, get_database_manager, TicketRepository,
+    create_error_response, ApiResponse, Ticket, TTLCache, logger
 )
 
 # Ensure upload folder exists
@@ -64,6 +88,49 @@ class Comment:
     comment: str
     created_at: str
 
+# SQL statements (module-level so every call hits sqlite3's statement cache)
+_SQL_INSERT_TICKET = """
+    INSERT INTO tickets (id, subject, priority, category, description, 
+                       status, user_id, created_at, attachment_url)
+    VALUES (?, ?, ?, ?, ?, 'open', ?, ?, ?)
+"""
+
+_SQL_SELECT_MY_TICKETS = """
+    SELECT id, subject, priority, category, description, status, 
+           user_id, created_at, attachment_url
+    FROM tickets WHERE user_id = ? ORDER BY created_at DESC
+"""
+
+# Cheap validators for ETags, read from covering indexes before the real
+# query. Tickets and comments are append-only, so (count, newest) changes
+# whenever the listing does
+_SQL_MY_TICKETS_VERSION = """
+    SELECT COUNT(*), MAX(created_at) FROM tickets WHERE user_id = ?
+"""
+
+_SQL_COMMENTS_VERSION = """
+    SELECT COUNT(*), MAX(created_at) FROM comments WHERE ticket_id = ?
+"""
+
+_SQL_STATUS_COUNTS = """
+    SELECT COUNT(*),
+           SUM(CASE WHEN status = 'open' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN status = 'in_progress' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN status = 'resolved' THEN 1 ELSE 0 END),
+           SUM(CASE WHEN status = 'closed' THEN 1 ELSE 0 END)
+    FROM tickets
+"""
+
+_SQL_SELECT_COMMENTS = """
+    SELECT id, ticket_id, user_id, comment, created_at
+    FROM comments WHERE ticket_id = ? ORDER BY created_at ASC
+"""
+
+_SQL_INSERT_TICKET_FILE = """
+    INSERT INTO ticket_files (id, ticket_id, file_url, file_name, created_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
 # API Request Models
 class CreateTicketRequest(BaseModel):
     subject: str
@@ -79,56 +146,58 @@ class ExtendedTicketRepository(TicketRepository):
     """Extended TicketRepository with additional methods for the main app"""
     
     def create_ticket(self, subject: str, priority: str, category: str, 
-                     description: str, user_id: str, attachment_url: str = None) -> Ticket:
-        """Create a new ticket"""
+                     description: str, user_id: str, attachment_url: str = None) -> Dict:
+        """Create a new ticket and return it as a plain dict"""
         ticket_id = str(uuid.uuid4())
         created_at = datetime.now(timezone.utc).isoformat()
         
-        with self.db.get_connection() as conn:
+        with self.db.write() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO tickets (id, subject, priority, category, description, 
-                                   status, user_id, created_at, attachment_url)
-                VALUES (?, ?, ?, ?, ?, 'open', ?, ?, ?)
-            """, (ticket_id, subject, priority, category, description, user_id, created_at, attachment_url))
-            conn.commit()
+            cursor.execute(_SQL_INSERT_TICKET, (ticket_id, subject, priority, category, description, user_id, created_at, attachment_url))
         
-        return Ticket(
-            id=ticket_id,
-            subject=subject,
-            priority=priority,
-            category=category,
-            description=description,
-            status='open',
-            user_id=user_id,
-            created_at=created_at,
-            attachment_url=attachment_url
-        )
+        # Built directly rather than via asdict(Ticket(...)), which deep-copies
+        return {
+            'id': ticket_id,
+            'subject': subject,
+            'priority': priority,
+            'category': category,
+            'description': description,
+            'status': 'open',
+            'user_id': user_id,
+            'created_at': created_at,
+            'attachment_url': attachment_url
+        }
     
     def get_my_tickets(self, user_id: str) -> List[Dict]:
         """Get all tickets for a user"""
-        with self.db.get_connection() as conn:
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_MY_TICKETS, (user_id,))
+            
+            # Pool connections use sqlite3.Row, which converts straight to a dict
+            return [dict(row) for row in cursor]
+    
+    def get_my_tickets_version(self, user_id: str) -> tuple:
+        """(count, newest created_at) of a user's tickets, for ETags"""
+        with self.db.read() as conn:
+            return tuple(conn.execute(_SQL_MY_TICKETS_VERSION, (user_id,)).fetchone())
+    
+    def get_status_counts(self):
+        """Get the total ticket count and a per-status breakdown"""
+        with self.db.read() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, subject, priority, category, description, status, 
-                       user_id, created_at, attachment_url
-                FROM tickets WHERE user_id = ? ORDER BY created_at DESC
-            """, (user_id,))
             
-            tickets = []
-            for row in cursor.fetchall():
-                tickets.append({
-                    'id': row[0],
-                    'subject': row[1],
-                    'priority': row[2],
-                    'category': row[3],
-                    'description': row[4],
-                    'status': row[5],
-                    'user_id': row[6],
-                    'created_at': row[7],
-                    'attachment_url': row[8]
-                })
-            return tickets
+            # Total and per-status counts in a single scan
+            cursor.execute(_SQL_STATUS_COUNTS)
+            total_tickets, open_count, in_progress, resolved, closed = cursor.fetchone()
+        
+        status_counts = {
+            'open': open_count or 0,
+            'in_progress': in_progress or 0,
+            'resolved': resolved or 0,
+            'closed': closed or 0
+        }
+        return total_tickets, status_counts
 
 class CommentRepository:
     def __init__(self, db_manager: DatabaseManager):
@@ -136,23 +205,15 @@ class CommentRepository:
     
     def get_comments(self, ticket_id: str) -> List[Dict]:
         """Get all comments for a ticket"""
-        with self.db.get_connection() as conn:
+        with self.db.read() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, ticket_id, user_id, comment, created_at
-                FROM comments WHERE ticket_id = ? ORDER BY created_at ASC
-            """, (ticket_id,))
-            
-            comments = []
-            for row in cursor.fetchall():
-                comments.append({
-                    'id': row[0],
-                    'ticket_id': row[1],
-                    'user_id': row[2],
-                    'comment': row[3],
-                    'created_at': row[4]
-                })
-            return comments
+            cursor.execute(_SQL_SELECT_COMMENTS, (ticket_id,))
+            return [dict(row) for row in cursor]
+    
+    def get_comments_version(self, ticket_id: str) -> tuple:
+        """(count, newest created_at) of a ticket's comments, for ETags"""
+        with self.db.read() as conn:
+            return tuple(conn.execute(_SQL_COMMENTS_VERSION, (ticket_id,)).fetchone())
 
 class TicketFileRepository:
     def __init__(self, db_manager: DatabaseManager):
@@ -163,41 +224,95 @@ class TicketFileRepository:
         file_id = str(uuid.uuid4())
         created_at = datetime.now(timezone.utc).isoformat()
         
-        with self.db.get_connection() as conn:
+        with self.db.write() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO ticket_files (id, ticket_id, file_url, file_name, created_at)
-                VALUES (?, ?, ?, ?, ?)
-            """, (file_id, ticket_id, file_url, file_name, created_at))
-            conn.commit()
+            cursor.execute(_SQL_INSERT_TICKET_FILE, (file_id, ticket_id, file_url, file_name, created_at))
+    
+    def create_ticket_files_bulk(self, ticket_id: str, files: List[tuple]) -> List[str]:
+        """Create ticket file records for several (file_url, file_name) pairs"""
+        created_at = datetime.now(timezone.utc).isoformat()
+        rows = [(str(uuid.uuid4()), ticket_id, file_url, file_name, created_at)
+                for file_url, file_name in files]
+        
+        # One transaction (and one WAL commit) for the whole batch
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(_SQL_INSERT_TICKET_FILE, rows)
+        
+        return [row[0] for row in rows]
 
 # Initialize components
-db_manager = DatabaseManager()
+db_manager = get_database_manager()
 storage_manager = StorageManager()
 ticket_repo = ExtendedTicketRepository(db_manager)
 comment_repo = CommentRepository(db_manager)
 file_repo = TicketFileRepository(db_manager)
 
+# Dashboard counts are global and polled often; a short TTL is plenty
+metrics_cache = TTLCache(maxsize=16, ttl=10)
+
+# Tickets only change through explicit writes; drop the entry on any update
+ticket_cache = TTLCache(maxsize=10_000, ttl=60)
+
 # FastAPI app
 app = FastAPI(
     title="Support Portal API",
     description="FastAPI backend for support ticket management with P1 incident support",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=Config.CORS_ORIGINS,
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["Content-Type", "X-User-Id", "Authorization"],
+    max_age=86400,  # let browsers reuse the preflight for a day
 )
 
 # Utility Functions
 def create_error_response(message: str, status_code: int = 400):
     return HTTPException(status_code=status_code, detail={"success": False, "message": message})
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check: weak comparison over a comma-separated list, or *"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
+
+def make_etag(source: bytes) -> str:
+    return '"' + hashlib.blake2b(source, digest_size=16).hexdigest() + '"'
+
+def not_modified(request: Request, etag: str,
+                 cache_control: str = "private, no-cache") -> Optional[Response]:
+    """304 response if the client already has `etag`, else None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
+
+def etag_response(request: Request, payload: ApiResponse, etag: str = None,
+                  cache_control: str = "private, no-cache") -> Response:
+    """Serialize once, tag with an ETag and answer 304 if the client already has it
+    
+    Endpoints that can derive `etag` cheaply should call not_modified() with
+    it before querying; otherwise the ETag is a hash of the serialized body.
+    """
+    body = orjson.dumps(payload.model_dump())
+    etag = etag or make_etag(body)
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 # API Endpoints
 @app.get("/")
 async def root():
@@ -207,118 +322,188 @@ async def root():
 async def health_check():
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+async def save_ticket(subject: str, priority: str, category: str, description: str,
+                      attachment_url: str = None) -> ApiResponse:
+    """Persist a ticket and wrap it in the standard response"""
+    ticket = await run_in_threadpool(
+        ticket_repo.create_ticket,
+        subject=subject,
+        priority=priority,
+        category=category,
+        description=description,
+        user_id=Config.DEFAULT_USER_ID,
+        attachment_url=attachment_url
+    )
+    
+    metrics_cache.delete("status_counts")
+    
+    return ApiResponse(
+        success=True,
+        message="Ticket created successfully",
+        data=ticket
+    )
+
 @app.post("/tickets")
 async def create_ticket(request: CreateTicketRequest):
-    """Create a new support ticket"""
+    """Create a new support ticket with an optional base64 attachment"""
     try:
         attachment_url = None
         
         # Handle file attachment if provided
         if request.attachment and request.attachment_name:
             try:
-                file_url, file_size = storage_manager.upload_file(
+                file_url, file_size = await run_in_threadpool(
+                    storage_manager.upload_file,
                     request.attachment,
                     request.attachment_name,
                     request.attachment_type or 'application/octet-stream'
                 )
                 attachment_url = file_url
             except Exception as file_error:
-                print(f"⚠️ File upload failed: {file_error}")
+                logger.warning("⚠️ File upload failed: %s", file_error)
                 # Continue without attachment rather than failing the whole request
         
-        # Create the ticket
-        ticket = ticket_repo.create_ticket(
-            subject=request.subject,
-            priority=request.priority,
-            category=request.category,
-            description=request.description,
-            user_id=Config.DEFAULT_USER_ID,
+        return await save_ticket(
+            request.subject,
+            request.priority,
+            request.category,
+            request.description,
             attachment_url=attachment_url
         )
+    
+    except Exception as e:
+        logger.error("❌ Create ticket error: %s", e)
+        raise create_error_response(f"Failed to create ticket: {str(e)}", 500)
+
+@app.post("/tickets/upload")
+async def create_ticket_multipart(
+    subject: str = Form(...),
+    priority: str = Form(...),
+    category: str = Form(...),
+    description: str = Form(...),
+    attachment: Optional[UploadFile] = File(None)
+):
+    """Create a new support ticket from multipart/form-data"""
+    try:
+        attachment_url = None
         
-        return ApiResponse(
-            success=True,
-            message="Ticket created successfully",
-            data=asdict(ticket)
-        )
+        # Handle file attachment if provided; the spooled upload is streamed
+        # to S3/disk without being read into memory
+        if attachment and attachment.filename:
+            try:
+                file_url, file_size = await run_in_threadpool(
+                    storage_manager.upload_fileobj,
+                    attachment.file,
+                    attachment.filename,
+                    attachment.content_type or 'application/octet-stream'
+                )
+                attachment_url = file_url
+            except Exception as file_error:
+                logger.warning("⚠️ File upload failed: %s", file_error)
+                # Continue without attachment rather than failing the whole request
+            finally:
+                await attachment.close()
+        
+        return await save_ticket(subject, priority, category, description, attachment_url=attachment_url)
     
     except Exception as e:
-        print(f"❌ Create ticket error: {e}")
+        logger.error("❌ Create ticket error: %s", e)
         raise create_error_response(f"Failed to create ticket: {str(e)}", 500)
 
 @app.get("/tickets/my")
-async def get_my_tickets(user_id: str = Config.DEFAULT_USER_ID):
+async def get_my_tickets(request: Request, user_id: str = Config.DEFAULT_USER_ID):
     """Get all tickets for the current user"""
     try:
-        tickets = ticket_repo.get_my_tickets(user_id)
-        return ApiResponse(
+        # Answer revalidations from the index-only version probe
+        version = await run_in_threadpool(ticket_repo.get_my_tickets_version, user_id)
+        etag = make_etag(orjson.dumps([user_id, *version]))
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        
+        tickets = await run_in_threadpool(ticket_repo.get_my_tickets, user_id)
+        return etag_response(request, ApiResponse(
             success=True,
             message=f"Found {len(tickets)} tickets",
             data={"tickets": tickets}
-        )
+        ), etag=etag)
     except Exception as e:
-        print(f"❌ Get tickets error: {e}")
+        logger.error("❌ Get tickets error: %s", e)
         raise create_error_response(f"Failed to fetch tickets: {str(e)}", 500)
 
 @app.get("/tickets/{ticket_id}")
-async def get_ticket(ticket_id: str):
+async def get_ticket(request: Request, ticket_id: str):
     """Get a specific ticket by ID"""
     try:
-        ticket = ticket_repo.get_ticket(ticket_id)
-        if not ticket:
-            raise create_error_response("Ticket not found", 404)
+        ticket = ticket_cache.get(ticket_id)
+        if ticket is None:
+            ticket = await run_in_threadpool(ticket_repo.get_ticket, ticket_id)
+            if not ticket:
+                raise create_error_response("Ticket not found", 404)
+            ticket_cache.set(ticket_id, ticket)
         
-        return ApiResponse(
+        return etag_response(request, ApiResponse(
             success=True,
             message="Ticket found",
             data=ticket
-        )
+        ))
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Get ticket error: {e}")
+        logger.error("❌ Get ticket error: %s", e)
         raise create_error_response(f"Failed to fetch ticket: {str(e)}", 500)
 
 @app.get("/tickets/{ticket_id}/comments")
-async def get_ticket_comments(ticket_id: str):
+async def get_ticket_comments(request: Request, ticket_id: str):
     """Get all comments for a ticket"""
     try:
-        comments = comment_repo.get_comments(ticket_id)
-        return ApiResponse(
+        version = await run_in_threadpool(comment_repo.get_comments_version, ticket_id)
+        etag = make_etag(orjson.dumps([ticket_id, *version]))
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        
+        comments = await run_in_threadpool(comment_repo.get_comments, ticket_id)
+        return etag_response(request, ApiResponse(
             success=True,
             message=f"Found {len(comments)} comments",
             data={"comments": comments}
-        )
+        ), etag=etag)
     except Exception as e:
-        print(f"❌ Get comments error: {e}")
+        logger.error("❌ Get comments error: %s", e)
         raise create_error_response(f"Failed to fetch comments: {str(e)}", 500)
 
 @app.get("/dashboard/metrics")
-async def get_dashboard_metrics():
+async def get_dashboard_metrics(request: Request):
     """Get dashboard metrics and statistics"""
     try:
-        with db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Get ticket counts by status
-            cursor.execute("SELECT status, COUNT(*) FROM tickets GROUP BY status")
-            status_counts = dict(cursor.fetchall())
-            
-            # Get total ticket count
-            cursor.execute("SELECT COUNT(*) FROM tickets")
-            total_tickets = cursor.fetchone()[0]
+        counts = metrics_cache.get("status_counts")
+        if counts is None:
+            counts = await run_in_threadpool(ticket_repo.get_status_counts)
+            metrics_cache.set("status_counts", counts)
+        total_tickets, status_counts = counts
         
-        return ApiResponse(
-            success=True,
-            message="Dashboard metrics retrieved",
-            data={
-                "total_tickets": total_tickets,
-                "status_breakdown": status_counts,
-                "timestamp": datetime.now().isoformat()
-            }
+        # Tag on the counts alone; the timestamp changes on every call
+        etag = make_etag(orjson.dumps(counts))
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        
+        return etag_response(
+            request,
+            ApiResponse(
+                success=True,
+                message="Dashboard metrics retrieved",
+                data={
+                    "total_tickets": total_tickets,
+                    "status_breakdown": status_counts,
+                    "timestamp": datetime.now().isoformat()
+                }
+            ),
+            etag=etag
         )
     except Exception as e:
-        print(f"❌ Get metrics error: {e}")
+        logger.error("❌ Get metrics error: %s", e)
         raise create_error_response(f"Failed to fetch metrics: {str(e)}", 500)
 
 # Import P1 Incident API routes
@@ -330,16 +515,17 @@ try:
     
     # Include P1 incident routes
     app.include_router(p1_router)
-    print("✅ P1 Incident API routes loaded successfully")
+    logger.info("✅ P1 Incident API routes loaded successfully")
 except ImportError as e:
-    print(f"⚠️ P1 Incident API not available: {e}")
+    logger.warning("⚠️ P1 Incident API not available: %s", e)
 
 # Error handlers
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    print(f"❌ Unhandled error: {exc}")
-    print(traceback.format_exc())
-    return JSONResponse(
+    # The stack is only formatted if the record is actually emitted;
+    # HTTPExceptions never reach here, FastAPI's own handler answers them
+    logger.error("❌ Unhandled error: %r", exc, exc_info=exc)
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False, 
@@ -357,12 +543,37 @@ def main():
     print(f"🌐 Server will be available at: http://localhost:{Config.PORT}")
     print(f"📚 API documentation: http://localhost:{Config.PORT}/docs")
     
+    # Outside DEBUG, let gunicorn fork UvicornWorkers that share the socket
+    if HAS_GUNICORN and not Config.DEBUG:
+        print("⚙️ Process manager: gunicorn (gunicorn_conf.py)")
+        try:
+            subprocess.run(
+                [sys.executable, "-m", "gunicorn", "-c", "gunicorn_conf.py", "app:app"],
+                cwd=os.path.dirname(os.path.abspath(__file__)),
+                check=True
+            )
+        except KeyboardInterrupt:
+            print("\n👋 Server stopped by user")
+        except Exception as e:
+            print(f"❌ Server failed to start: {e}")
+            sys.exit(1)
+        return
+    
+    # Reload only makes sense for local development, and uvicorn cannot
+    # combine it with multiple worker processes
+    workers = 1 if Config.DEBUG else 2 * (os.cpu_count() or 1) + 1
+    print(f"⚙️ Workers: {workers} (loop: {'uvloop' if HAS_UVLOOP else 'asyncio'})")
+    
     try:
         uvicorn.run(
             "app:app",
             host="0.0.0.0",
             port=Config.PORT,
             reload=Config.DEBUG,
+            workers=workers,
+            loop="uvloop" if HAS_UVLOOP else "asyncio",
+            http="httptools" if HAS_HTTPTOOLS else "h11",
+            timeout_keep_alive=30,
             log_level="info"
         )
     except KeyboardInterrupt:
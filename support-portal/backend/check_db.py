@@ -2,7 +2,8 @@
 import sqlite3
 
 def check_tickets():
-    conn = sqlite3.connect('support_portal.db')
+    conn = sqlite3.connect('file:support_portal.db?mode=ro', uri=True)
+    conn.execute("PRAGMA mmap_size=268435456")  # read-only: map pages straight from the OS cache
     cursor = conn.cursor()
     
     # Get recent tickets
@@ -24,14 +25,12 @@ def check_tickets():
         print(f"   Created: {ticket[5]}")
         print()
     
-    # Count P1 tickets
-    cursor.execute("SELECT COUNT(*) FROM tickets WHERE priority = 'P1'")
-    p1_count = cursor.fetchone()[0]
-    print(f"Total P1 Critical tickets: {p1_count}")
-    
-    # Count all tickets by priority
+    # Count all tickets by priority; the P1 total comes from the same scan
     cursor.execute("SELECT priority, COUNT(*) FROM tickets GROUP BY priority")
     priority_counts = cursor.fetchall()
+    p1_count = dict(priority_counts).get('P1', 0)
+    print(f"Total P1 Critical tickets: {p1_count}")
+    
     print("\n=== Tickets by Priority ===")
     for priority, count in priority_counts:
         print(f"{priority}: {count} tickets")
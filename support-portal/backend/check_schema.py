@@ -2,21 +2,19 @@
 import sqlite3
 
 def check_database_schema():
-    conn = sqlite3.connect('support_portal.db')
+    conn = sqlite3.connect('file:support_portal.db?mode=ro', uri=True)
+    conn.execute("PRAGMA mmap_size=268435456")  # read-only: map pages straight from the OS cache
     cursor = conn.cursor()
     
     # Get all tables
     cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = cursor.fetchall()
+    tables = [row[0] for row in cursor]
     print("=== All Tables in Database ===")
     for table in tables:
-        print(f"- {table[0]}")
+        print(f"- {table}")
     
-    # Check if comments table exists
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='comments'")
-    comments_table = cursor.fetchone()
-    
-    if comments_table:
+    # Check if comments table exists (reuses the listing above, no extra query)
+    if 'comments' in set(tables):
         print("\n=== Comments Table Schema ===")
         cursor.execute("PRAGMA table_info(comments)")
         columns = cursor.fetchall()
@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for running the API with Uvicorn workers
+
+    gunicorn -c gunicorn_conf.py app:app
+
+Each worker opens its own SQLite connections on first use, so the
+listen socket can be shared across processes safely.
+
+Settings are read straight from the environment rather than from
+shared.Config: importing shared in the master would start its log
+QueueListener thread before the fork, and workers would inherit the
+queue but not the thread that drains it.
+"""
+
+import os
+
+# Load environment variables
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:
+    pass
+
+PORT = int(os.getenv("PORT", "8000"))
+DEBUG = os.getenv("DEBUG", "true").lower() == "true"
+
+bind = f"0.0.0.0:{PORT}"
+workers = 2 * (os.cpu_count() or 1) + 1
+worker_class = "uvicorn.workers.UvicornWorker"
+# Matches timeout_keep_alive in app_new.main() so dashboard polling reuses connections
+keepalive = 30
+accesslog = "-"
+errorlog = "-"
+loglevel = "debug" if DEBUG else "info"
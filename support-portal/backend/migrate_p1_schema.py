@@ -14,10 +14,14 @@ def migrate_database():
         print(f"Database not found at: {db_path}")
         return
     
-    conn = sqlite3.connect(db_path)
+    # Manage the transaction explicitly: sqlite3 would otherwise autocommit
+    # the DDL statements one by one
+    conn = sqlite3.connect(db_path, isolation_level=None)
     cursor = conn.cursor()
     
     try:
+        cursor.execute("BEGIN IMMEDIATE")
+        
         # Check if p1_incidents table exists
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='p1_incidents'")
         if cursor.fetchone():
@@ -46,10 +50,21 @@ def migrate_database():
                 )
             """)
             
-            # Copy data from old table to new table
+            # Copy data from old table to new table, by name rather than position
             cursor.execute("""
-                INSERT INTO p1_incidents_new 
-                SELECT * FROM p1_incidents
+                INSERT INTO p1_incidents_new (
+                    id, ticket_id, title, description, severity, status,
+                    client_user_id, assigned_admin_user_id, slack_channel_id,
+                    slack_channel_name, incident_commander, business_impact,
+                    technical_details, resolution_steps, created_at, updated_at,
+                    resolved_at
+                )
+                SELECT id, ticket_id, title, description, severity, status,
+                       client_user_id, assigned_admin_user_id, slack_channel_id,
+                       slack_channel_name, incident_commander, business_impact,
+                       technical_details, resolution_steps, created_at, updated_at,
+                       resolved_at
+                FROM p1_incidents
             """)
             
             # Drop old table and rename new table
@@ -60,11 +75,12 @@ def migrate_database():
         else:
             print("P1 incidents table doesn't exist, will be created with new schema")
         
-        conn.commit()
+        cursor.execute("COMMIT")
         
     except Exception as e:
         print(f"Error during migration: {e}")
-        conn.rollback()
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
     finally:
         conn.close()
 
@@ -0,0 +1,206 @@
+"""
+Support Portal - Repository classes
+
+Ticket, comment and ticket file data access for the FastAPI app. The
+module is fully annotated so it can be compiled with mypyc (see
+setup.py); app.py imports it the same way either way.
+"""
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Tuple
+
+from shared import DatabaseManager, TicketRepository, Ticket, uuid7
+
+# SQL statements (module-level so every call hits sqlite3's statement cache)
+# RETURNING needs SQLite 3.35+; older builds (e.g. Ubuntu 20.04's 3.31)
+# build the Ticket from the bound values instead
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_SQL_INSERT_TICKET = """
+    INSERT INTO tickets (id, subject, priority, category, description, 
+                       status, user_id, created_at, attachment_url)
+    VALUES (?, ?, ?, ?, ?, 'open', ?, ?, ?)
+"""
+
+_SQL_INSERT_TICKET_RETURNING = _SQL_INSERT_TICKET + """
+    RETURNING id, subject, priority, category, description, status,
+              user_id, created_at, attachment_url
+"""
+
+_SQL_SELECT_MY_TICKETS = """
+    SELECT id, subject, priority, category, description, status, 
+           user_id, created_at, attachment_url
+    FROM tickets WHERE user_id = ? ORDER BY created_at DESC
+"""
+
+_SQL_SELECT_TICKET = """
+    SELECT id, subject, priority, category, description, status, 
+           user_id, created_at, attachment_url
+    FROM tickets WHERE id = ?
+"""
+
+_SQL_SELECT_USER_TICKET = _SQL_SELECT_TICKET + " AND user_id = ?"
+
+_SQL_DASHBOARD_METRICS = """
+    SELECT COUNT(*),
+           SUM(status IN ('open', 'in_progress')),
+           SUM(status IN ('resolved', 'closed'))
+    FROM tickets
+"""
+
+_SQL_DASHBOARD_USER_METRICS = _SQL_DASHBOARD_METRICS + " WHERE user_id = ?"
+
+_SQL_SELECT_COMMENTS = """
+    SELECT id, ticket_id, user_id, comment, created_at
+    FROM comments WHERE ticket_id = ? ORDER BY created_at ASC
+"""
+
+_SQL_INSERT_COMMENT = """
+    INSERT INTO comments (id, ticket_id, user_id, comment, created_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+_SQL_INSERT_TICKET_FILE = """
+    INSERT INTO ticket_files (id, ticket_id, file_url, file_name, created_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+DEMO_COMMENT_TEXT = "Thank you for submitting your ticket. We've received your request and will respond within 24 hours."
+
+class ExtendedTicketRepository(TicketRepository):
+    """TicketRepository with ticket writes, listings and metrics for this app"""
+    
+    def _insert_ticket(self, cursor: sqlite3.Cursor, params: Tuple[Any, ...]) -> Ticket:
+        """Insert one ticket row and return it as a Ticket"""
+        if HAS_RETURNING:
+            # RETURNING hands back the stored row, so it is the source of truth
+            cursor.execute(_SQL_INSERT_TICKET_RETURNING, params)
+            return Ticket(**dict(cursor.fetchone()))
+        
+        cursor.execute(_SQL_INSERT_TICKET, params)
+        ticket_id, subject, priority, category, description, user_id, created_at, attachment_url = params
+        return Ticket(
+            id=ticket_id,
+            subject=subject,
+            priority=priority,
+            category=category,
+            description=description,
+            status='open',
+            user_id=user_id,
+            created_at=created_at,
+            attachment_url=attachment_url
+        )
+    
+    def create_ticket(self, subject: str, priority: str, category: str, 
+                     description: str, user_id: str, attachment_url: Optional[str] = None) -> Ticket:
+        """Create a new ticket"""
+        ticket_id = str(uuid7())
+        created_at = datetime.now(timezone.utc).isoformat()
+        
+        with self.db.write() as conn:
+            return self._insert_ticket(conn.cursor(), (ticket_id, subject, priority, category, description, user_id, created_at, attachment_url))
+    
+    def create_ticket_bundle(self, subject: str, priority: str, category: str,
+                             description: str, user_id: str, attachment_url: Optional[str] = None,
+                             attachment_name: Optional[str] = None,
+                             demo_comment: Optional[str] = None) -> Ticket:
+        """Create a ticket plus its file record and demo comment in one transaction"""
+        ticket_id = str(uuid7())
+        created_at = datetime.now(timezone.utc).isoformat()
+        
+        # One BEGIN IMMEDIATE ... COMMIT for the whole POST instead of one per row
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            ticket = self._insert_ticket(cursor, (ticket_id, subject, priority, category, description, user_id, created_at, attachment_url))
+            
+            if attachment_url:
+                cursor.execute(_SQL_INSERT_TICKET_FILE, (str(uuid7()), ticket_id, attachment_url, attachment_name, created_at))
+            
+            if demo_comment:
+                cursor.execute(_SQL_INSERT_COMMENT, (str(uuid7()), ticket_id, 'support-team', demo_comment, created_at))
+        
+        return ticket
+    
+    def get_my_tickets(self, user_id: str) -> List[Dict[str, Any]]:
+        """Get all tickets for a user"""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_MY_TICKETS, (user_id,))
+            return [dict(row) for row in cursor]
+    
+    def get_ticket(self, ticket_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get a specific ticket"""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            if user_id:
+                cursor.execute(_SQL_SELECT_USER_TICKET, (ticket_id, user_id))
+            else:
+                cursor.execute(_SQL_SELECT_TICKET, (ticket_id,))
+            row = cursor.fetchone()
+            
+            return dict(row) if row else None
+    
+    def get_dashboard_metrics(self, user_id: Optional[str] = None) -> Dict[str, int]:
+        """Get dashboard metrics"""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            
+            # One pass over the user's tickets instead of three COUNT(*) queries
+            if user_id:
+                cursor.execute(_SQL_DASHBOARD_USER_METRICS, (user_id,))
+            else:
+                cursor.execute(_SQL_DASHBOARD_METRICS)
+            row = cursor.fetchone()
+            
+            return {
+                'total': row[0],
+                'open': row[1] or 0, 
+                'resolved': row[2] or 0
+            }
+
+class CommentRepository:
+    def __init__(self, db_manager: DatabaseManager) -> None:
+        self.db = db_manager
+    
+    def get_comments_for_ticket(self, ticket_id: str) -> List[Dict[str, Any]]:
+        """Get all comments for a ticket"""
+        with self.db.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_COMMENTS, (ticket_id,))
+            return [dict(row) for row in cursor]
+    
+    def create_comment(self, ticket_id: str, user_id: str, comment_text: str) -> Dict[str, str]:
+        """Create a new comment for a ticket"""
+        comment_id = str(uuid7())
+        created_at = datetime.now(timezone.utc).isoformat()
+        
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_INSERT_COMMENT, (comment_id, ticket_id, user_id, comment_text, created_at))
+            
+        return {
+            'id': comment_id,
+            'ticket_id': ticket_id,
+            'user_id': user_id,
+            'comment': comment_text,
+            'created_at': created_at
+        }
+    
+    def create_demo_comment(self, ticket_id: str, user_id: str) -> Dict[str, str]:
+        """Create a demo comment for development"""
+        return self.create_comment(ticket_id, 'support-team', DEMO_COMMENT_TEXT)
+
+class TicketFileRepository:
+    def __init__(self, db_manager: DatabaseManager) -> None:
+        self.db = db_manager
+    
+    def save_ticket_file(self, ticket_id: str, file_url: str, file_name: str) -> None:
+        """Save ticket file record"""
+        file_id = str(uuid7())
+        created_at = datetime.now(timezone.utc).isoformat()
+        
+        with self.db.write() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_INSERT_TICKET_FILE, (file_id, ticket_id, file_url, file_name, created_at))
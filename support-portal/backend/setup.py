@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Optional ahead-of-time build of the repository layer with mypyc.
+
+    pip install mypy
+    python setup.py build_ext --inplace
+
+This drops a compiled repositories extension next to repositories.py;
+app.py imports it unchanged. Delete the built .so to go back to the
+pure Python module.
+"""
+
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+except ImportError:
+    print("❌ mypyc not installed")
+    print("Install with: pip install mypy")
+    raise SystemExit(1)
+
+setup(
+    name="support-portal-backend",
+    py_modules=["repositories"],
+    ext_modules=mypycify([
+        "--ignore-missing-imports",
+        "--follow-imports=silent",
+        "repositories.py",
+    ]),
+)
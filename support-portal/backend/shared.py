@@ -9,11 +9,23 @@ import sys
 import json
 import uuid
 import base64
+import queue
+import re
+import atexit
+import logging
+import logging.handlers
+import shutil
 import sqlite3
+import tempfile
+import threading
+import time
 import traceback
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from dataclasses import dataclass
 
 # FastAPI imports
@@ -24,11 +36,44 @@ from pydantic import BaseModel
 # AWS imports (optional)
 try:
     import boto3
+    from boto3.s3.transfer import TransferConfig
     from botocore.exceptions import ClientError, NoCredentialsError
     HAS_BOTO3 = True
 except ImportError:
     HAS_BOTO3 = False
 
+# Logging
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue the raw record; formatting happens on the listener thread"""
+    
+    def prepare(self, record):
+        return record
+
+def _init_logger() -> logging.Logger:
+    """Set up the shared logger with a background QueueListener writing to stderr"""
+    log = logging.getLogger("support_portal")
+    if not log.handlers:
+        log_queue = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        
+        log.addHandler(DeferredQueueHandler(log_queue))
+        log.setLevel(logging.INFO)
+        log.propagate = False
+    return log
+
+logger = _init_logger()
+
+# SIMD-accelerated base64 (optional)
+try:
+    import pybase64
+    b64decode = pybase64.b64decode
+except ImportError:
+    b64decode = base64.b64decode
+
 # Load environment variables
 try:
     from dotenv import load_dotenv
@@ -55,9 +100,39 @@ class Config:
     # Auth
     DEFAULT_USER_ID = os.getenv("DEFAULT_USER_ID", "demo-user")
     
+    # CORS (comma-separated list of frontend origins)
+    CORS_ORIGINS = [
+        origin.strip()
+        for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
+        if origin.strip()
+    ]
+    
     # Server
     PORT = int(os.getenv("PORT", "8000"))
     DEBUG = os.getenv("DEBUG", "true").lower() == "true"
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Level gating happens before any formatting, so suppressed calls are cheap
+logger.setLevel(getattr(logging, Config.LOG_LEVEL, logging.INFO))
+
+# S3 multipart transfer settings, shared by every upload
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True
+) if HAS_BOTO3 else None
+
+@lru_cache(maxsize=None)
+def get_s3_client(access_key_id: str, secret_access_key: str, region: str):
+    """Build the boto3 S3 client once per credential set and reuse it"""
+    # Client creation loads config and endpoint metadata (~100ms); clients are thread-safe
+    return boto3.client(
+        's3',
+        aws_access_key_id=access_key_id,
+        aws_secret_access_key=secret_access_key,
+        region_name=region
+    )
 
 # Common Response Models
 class ApiResponse(BaseModel):
@@ -65,6 +140,26 @@ class ApiResponse(BaseModel):
     message: str = "OK"
     data: Optional[Dict[Any, Any]] = None
 
+# SQLite tuning applied once to every connection we open
+SQLITE_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA busy_timeout=5000;
+    PRAGMA cache_size=-20000;
+    PRAGMA temp_store=memory;
+    PRAGMA mmap_size=268435456;
+    PRAGMA foreign_keys=ON;
+"""
+
+# Base64 attachments are decoded in slices (a multiple of 4 characters) into
+# a spooled temp file, so peak memory is bounded by the slice size
+B64_CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 1 << 20
+
+# Anything outside [A-Za-z0-9_.-] in an uploaded name becomes "_" in the
+# storage key (compiled once, not per upload)
+UNSAFE_FILENAME_CHARS = re.compile(r"[^\w.-]", re.ASCII)
+
 # Utility Functions
 def create_error_response(message: str, status_code: int = 400):
     """Create a standardized error response"""
@@ -77,11 +172,176 @@ def create_error_response(message: str, status_code: int = 400):
         }
     )
 
+def uuid7() -> uuid.UUID:
+    """Time-ordered UUID (version 7) so new primary keys append to the B-tree"""
+    value = (time.time_ns() // 1_000_000) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = (value & ~(0xF << 76)) | (0x7 << 76)  # version 7
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)  # RFC 4122 variant
+    return uuid.UUID(int=value)
+
+def _decoded_len(file_data: Union[str, bytes], start: int = 0) -> int:
+    """Decoded size of a base64 payload, computed from its length in O(1)
+    
+    Every 4 characters decode to 3 bytes, less one per trailing '='.
+    Embedded whitespace makes this an over-estimate, never an under-estimate.
+    """
+    padding = file_data[-2:].count('=' if isinstance(file_data, str) else b'=')
+    return (len(file_data) - start) * 3 // 4 - padding
+
+
+def spool_base64(file_data: Union[str, bytes], max_size: int = None):
+    """Stream-decode base64 (or a data: URL) into a SpooledTemporaryFile
+    
+    Accepts the payload as text or raw bytes. Returns (file, size) with the
+    file rewound to the start.
+    """
+    max_size = max_size or Config.MAX_FILE_SIZE
+    is_text = isinstance(file_data, str)
+    # Skip the "data:...;base64," header by offset instead of copying the payload
+    start = file_data.find(',' if is_text else b',') + 1
+    
+    # Reject oversize payloads from their length alone before any decoding work
+    if _decoded_len(file_data, start) > max_size:
+        raise ValueError(f"File size exceeds limit ({max_size})")
+    
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    
+    try:
+        file_size = 0
+        carry = b""
+        for offset in range(start, len(file_data), B64_CHUNK_SIZE):
+            chunk = file_data[offset:offset + B64_CHUNK_SIZE]
+            if is_text:
+                chunk = chunk.encode('ascii')
+            chunk = carry + chunk.translate(None, b" \t\r\n")
+            aligned = len(chunk) - len(chunk) % 4
+            carry = chunk[aligned:]
+            
+            decoded = b64decode(chunk[:aligned], validate=False)
+            file_size += len(decoded)
+            if file_size > max_size:
+                raise ValueError(f"File size exceeds limit ({max_size})")
+            spool.write(decoded)
+        
+        if carry:
+            # Leftover characters that don't form a full quantum are malformed
+            b64decode(carry, validate=False)
+        
+        spool.seek(0)
+        return spool, file_size
+    except Exception:
+        spool.close()
+        raise
+
+def storage_filename(file_name: str) -> str:
+    """Collision-free storage name: 32-char hex UUID plus the sanitized original name"""
+    return f"{uuid.uuid4().hex}_{UNSAFE_FILENAME_CHARS.sub('_', file_name)}"
+
+# In-process Cache
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after `ttl` seconds"""
+    
+    def __init__(self, maxsize: int = 10_000, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+# SQLite Connection Pool
+class SqlitePool:
+    """One writer connection and N reader connections reused across requests"""
+    
+    def __init__(self, connect, readers: int = None):
+        self.writers = queue.Queue(maxsize=1)
+        self.readers = queue.Queue(maxsize=readers or os.cpu_count() or 4)
+        
+        # BEGIN IMMEDIATE on the writer so it never has to upgrade a read lock
+        self.writers.put(connect(isolation_level="IMMEDIATE"))
+        for _ in range(self.readers.maxsize):
+            self.readers.put(connect())
+    
+    @contextmanager
+    def read(self):
+        """Borrow a reader connection for SELECT statements"""
+        conn = self.readers.get()
+        try:
+            yield conn
+        finally:
+            self.readers.put(conn)
+    
+    @contextmanager
+    def write(self):
+        """Borrow the writer connection; commits on success, rolls back on error"""
+        conn = self.writers.get()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self.writers.put(conn)
+
 # Database Manager
+# SQLite paths whose schema has been checked in this process
+_schema_ready = set()
+_schema_lock = threading.Lock()
+
 class DatabaseManager:
     def __init__(self):
         self.db_path = Config.SQLITE_DB_PATH
-        self.init_database()
+        with _schema_lock:
+            if self.db_path not in _schema_ready:
+                self.init_database()
+                _schema_ready.add(self.db_path)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+    
+    @property
+    def pool(self) -> SqlitePool:
+        """Per-process connection pool, opened on first use"""
+        # SQLite connections must not cross fork(), so a forked worker
+        # (e.g. gunicorn --preload) opens its own pool
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != pid:
+                    self._pool = SqlitePool(self.connect_sqlite)
+                    self._pool_pid = pid
+        return self._pool
+    
+    def read(self):
+        """Pooled connection for read-only queries"""
+        return self.pool.read()
+    
+    def write(self):
+        """Pooled connection for INSERT/UPDATE statements"""
+        return self.pool.write()
     
     def get_connection(self):
         """Get database connection with fallback to SQLite"""
@@ -91,15 +351,32 @@ class DatabaseManager:
                 import psycopg2
                 return psycopg2.connect(Config.DATABASE_URL)
             except Exception as e:
-                print(f"⚠️ PostgreSQL connection failed, falling back to SQLite: {e}")
+                logger.warning("⚠️ PostgreSQL connection failed, falling back to SQLite: %s", e)
         
-        return sqlite3.connect(self.db_path)
+        return self.connect_sqlite()
+    
+    def connect_sqlite(self, isolation_level: str = ""):
+        """Open a SQLite connection with the performance PRAGMAs applied"""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=isolation_level,
+            cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        conn.executescript(SQLITE_PRAGMAS)
+        return conn
     
     def init_database(self):
         """Initialize database tables"""
-        with self.get_connection() as conn:
+        with closing(self.get_connection()) as conn:
             cursor = conn.cursor()
             
+            # sqlite3 runs DDL in autocommit mode; open one transaction so the
+            # whole schema is written with a single journal flush
+            if isinstance(conn, sqlite3.Connection):
+                cursor.execute("BEGIN IMMEDIATE")
+            
             # Tickets table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS tickets (
@@ -139,79 +416,131 @@ class DatabaseManager:
                 )
             """)
             
-
+            # Indexes backing the per-user ticket list, comments list and metrics
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_tickets_user_created ON tickets(user_id, created_at DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_comments_ticket_created ON comments(ticket_id, created_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_tickets_user_status ON tickets(user_id, status)")
+            # app_new's dashboard counts across all users
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_tickets_status ON tickets(status)")
+            # Priority filters/grouping and newest-first listings in the admin scripts
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_tickets_priority_created ON tickets(priority, created_at DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_tickets_created ON tickets(created_at DESC)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_ticket_files_ticket ON ticket_files(ticket_id)")
             
             conn.commit()
+            
+            if isinstance(conn, sqlite3.Connection):
+                self.analyze_once(conn)
             print("✅ Database initialized successfully")
+    
+    def analyze_once(self, conn: sqlite3.Connection):
+        """Gather planner statistics the first time the database is set up"""
+        # A full ANALYZE on every process start would have each worker queue
+        # for the write lock; later runs only keep the stats fresh cheaply
+        try:
+            has_stats = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'"
+            ).fetchone()
+            conn.execute("PRAGMA optimize" if has_stats else "ANALYZE")
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            # Statistics are an optimization; a busy database must not stop startup
+            logger.warning("⚠️ Skipped ANALYZE: %s", e)
+
+_database_manager: Optional[DatabaseManager] = None
+_database_manager_lock = threading.Lock()
+
+def get_database_manager() -> DatabaseManager:
+    """Process-wide DatabaseManager shared by every app module"""
+    global _database_manager
+    if _database_manager is None:
+        with _database_manager_lock:
+            if _database_manager is None:
+                _database_manager = DatabaseManager()
+    return _database_manager
 
 # Storage Manager
 class StorageManager:
     def __init__(self):
         self.s3_client = None
         self.init_s3()
+        # Created once here rather than on every local upload
+        os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
     
     def init_s3(self):
         """Initialize S3 client if credentials are available"""
         if HAS_BOTO3 and Config.AWS_ACCESS_KEY_ID and Config.AWS_SECRET_ACCESS_KEY:
             try:
-                self.s3_client = boto3.client(
-                    's3',
-                    aws_access_key_id=Config.AWS_ACCESS_KEY_ID,
-                    aws_secret_access_key=Config.AWS_SECRET_ACCESS_KEY,
-                    region_name=Config.AWS_REGION
+                self.s3_client = get_s3_client(
+                    Config.AWS_ACCESS_KEY_ID,
+                    Config.AWS_SECRET_ACCESS_KEY,
+                    Config.AWS_REGION
                 )
                 print("✅ S3 client initialized")
             except Exception as e:
                 print(f"⚠️ S3 initialization failed: {e}")
     
-    def upload_file(self, file_data: str, file_name: str, file_type: str = None):
-        """Upload file to S3 or local storage"""
+    def upload_file(self, file_data: Union[str, bytes], file_name: str, file_type: str = None):
+        """Decode a base64 attachment and upload it to S3 or local storage"""
         try:
-            # Decode base64 file data
-            if ',' in file_data:
-                file_data = file_data.split(',', 1)[1]
-            
-            file_bytes = base64.b64decode(file_data)
-            file_size = len(file_bytes)
+            spool, file_size = spool_base64(file_data)
+        except Exception as e:
+            logger.error("❌ File upload failed: %s", e)
+            raise HTTPException(status_code=400, detail=f"File upload failed: {str(e)}")
+        
+        with spool:
+            return self.upload_fileobj(spool, file_name, file_type, file_size)
+    
+    def upload_fileobj(self, fileobj, file_name: str, file_type: str = None, file_size: int = None):
+        """Stream a binary file object to S3 or local storage"""
+        try:
+            if file_size is None:
+                fileobj.seek(0, os.SEEK_END)
+                file_size = fileobj.tell()
+                fileobj.seek(0)
             
             # Check file size
             if file_size > Config.MAX_FILE_SIZE:
                 raise ValueError(f"File size ({file_size}) exceeds limit ({Config.MAX_FILE_SIZE})")
             
             # Generate unique filename
-            unique_filename = f"{uuid.uuid4()}_{file_name}"
+            unique_filename = storage_filename(file_name)
             
             # Try S3 upload first
             if self.s3_client and Config.S3_BUCKET_NAME:
                 try:
-                    self.s3_client.put_object(
-                        Bucket=Config.S3_BUCKET_NAME,
-                        Key=unique_filename,
-                        Body=file_bytes,
-                        ContentType=file_type or 'application/octet-stream'
+                    self.s3_client.upload_fileobj(
+                        fileobj,
+                        Config.S3_BUCKET_NAME,
+                        unique_filename,
+                        ExtraArgs={'ContentType': file_type or 'application/octet-stream'},
+                        Config=S3_TRANSFER_CONFIG
                     )
                     file_url = f"https://{Config.S3_BUCKET_NAME}.s3.{Config.AWS_REGION}.amazonaws.com/{unique_filename}"
-                    print(f"✅ File uploaded to S3: {file_url}")
+                    logger.info("✅ File uploaded to S3: %s", file_url)
                     return file_url, file_size
                 except Exception as e:
-                    print(f"⚠️ S3 upload failed, falling back to local storage: {e}")
+                    logger.warning("⚠️ S3 upload failed, falling back to local storage: %s", e)
+                    fileobj.seek(0)
             
             # Fallback to local storage
             local_path = Path(Config.UPLOAD_FOLDER) / unique_filename
-            os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
             with open(local_path, 'wb') as f:
-                f.write(file_bytes)
+                shutil.copyfileobj(fileobj, f)
             
             file_url = f"/uploads/{unique_filename}"
-            print(f"✅ File saved locally: {file_url}")
+            logger.info("✅ File saved locally: %s", file_url)
             return file_url, file_size
             
         except Exception as e:
-            print(f"❌ File upload failed: {e}")
+            logger.error("❌ File upload failed: %s", e)
             raise HTTPException(status_code=400, detail=f"File upload failed: {str(e)}")
 
 # Data Models
-@dataclass
+# slots= needs Python 3.10; older interpreters keep the per-instance __dict__
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(frozen=True, **_SLOTS)
 class Ticket:
     id: str
     subject: str
@@ -224,31 +553,23 @@ class Ticket:
     attachment_url: Optional[str] = None
 
 # Repository Classes
+# Hoisted so every lookup reuses the same text and hits the statement cache
+_SQL_SELECT_TICKET = """
+    SELECT id, subject, priority, category, description, status, 
+           user_id, created_at, attachment_url
+    FROM tickets WHERE id = ?
+"""
+
 class TicketRepository:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
     
     def get_ticket(self, ticket_id: str) -> Optional[Dict]:
         """Get a single ticket by ID"""
-        with self.db.get_connection() as conn:
+        # Borrow a pooled reader instead of opening (and leaking) a connection per lookup
+        with self.db.read() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, subject, priority, category, description, status, 
-                       user_id, created_at, attachment_url
-                FROM tickets WHERE id = ?
-            """, (ticket_id,))
+            cursor.execute(_SQL_SELECT_TICKET, (ticket_id,))
             
             row = cursor.fetchone()
-            if row:
-                return {
-                    'id': row[0],
-                    'subject': row[1],
-                    'priority': row[2],
-                    'category': row[3],
-                    'description': row[4],
-                    'status': row[5],
-                    'user_id': row[6],
-                    'created_at': row[7],
-                    'attachment_url': row[8]
-                }
-            return None
\ No newline at end of file
+            return dict(row) if row else None
\ No newline at end of file
@@ -12,7 +12,8 @@ def show_database_contents():
         print(f"Database not found at: {db_path}")
         return
     
-    conn = sqlite3.connect(db_path)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.execute("PRAGMA mmap_size=268435456")  # read-only: map pages straight from the OS cache
     conn.row_factory = sqlite3.Row  # This enables column access by name
     cursor = conn.cursor()
     
@@ -24,9 +25,8 @@ def show_database_contents():
     print("\n📋 TICKETS:")
     print("-" * 40)
     cursor.execute("SELECT * FROM tickets ORDER BY created_at DESC")
-    tickets = cursor.fetchall()
     
-    for ticket in tickets:
+    for ticket in cursor:
         print(f"ID: {ticket['id']}")
         print(f"Subject: {ticket['subject']}")
         print(f"Description: {ticket['description']}")
@@ -45,52 +45,53 @@ def show_database_contents():
     print("\n📎 TICKET FILES:")
     print("-" * 40)
     cursor.execute("SELECT * FROM ticket_files")
-    files = cursor.fetchall()
-    
-    if files:
-        for file in files:
-            print(f"File ID: {file['id']}")
-            print(f"Ticket ID: {file['ticket_id']}")
-            print(f"Original Name: {file['original_filename']}")
-            print(f"Stored Name: {file['stored_filename']}")
-            print(f"File Size: {file['file_size']} bytes")
-            print(f"Content Type: {file['content_type']}")
-            print(f"Storage Location: {file['storage_location']}")
-            print(f"S3 Key: {file['s3_key']}")
-            print(f"Uploaded: {file['created_at']}")
-            print("-" * 40)
-    else:
+    
+    has_files = False
+    for file in cursor:
+        has_files = True
+        print(f"File ID: {file['id']}")
+        print(f"Ticket ID: {file['ticket_id']}")
+        print(f"Original Name: {file['original_filename']}")
+        print(f"Stored Name: {file['stored_filename']}")
+        print(f"File Size: {file['file_size']} bytes")
+        print(f"Content Type: {file['content_type']}")
+        print(f"Storage Location: {file['storage_location']}")
+        print(f"S3 Key: {file['s3_key']}")
+        print(f"Uploaded: {file['created_at']}")
+        print("-" * 40)
+    if not has_files:
         print("No files uploaded yet")
     
     # Show comments
     print("\n💬 COMMENTS:")
     print("-" * 40)
     cursor.execute("SELECT * FROM comments ORDER BY created_at")
-    comments = cursor.fetchall()
-    
-    if comments:
-        for comment in comments:
-            print(f"Comment ID: {comment['id']}")
-            print(f"Ticket ID: {comment['ticket_id']}")
-            print(f"User ID: {comment['user_id']}")
-            print(f"Content: {comment['content']}")
-            print(f"Created: {comment['created_at']}")
-            print("-" * 40)
-    else:
+    
+    has_comments = False
+    for comment in cursor:
+        has_comments = True
+        print(f"Comment ID: {comment['id']}")
+        print(f"Ticket ID: {comment['ticket_id']}")
+        print(f"User ID: {comment['user_id']}")
+        print(f"Content: {comment['content']}")
+        print(f"Created: {comment['created_at']}")
+        print("-" * 40)
+    if not has_comments:
         print("No comments yet")
     
     # Show database statistics
     print("\n📊 DATABASE STATISTICS:")
     print("-" * 40)
     
-    cursor.execute("SELECT COUNT(*) as count FROM tickets")
-    ticket_count = cursor.fetchone()['count']
-    
-    cursor.execute("SELECT COUNT(*) as count FROM ticket_files")
-    file_count = cursor.fetchone()['count']
-    
-    cursor.execute("SELECT COUNT(*) as count FROM comments")
-    comment_count = cursor.fetchone()['count']
+    cursor.execute("""
+        SELECT (SELECT COUNT(*) FROM tickets) AS tickets,
+               (SELECT COUNT(*) FROM ticket_files) AS files,
+               (SELECT COUNT(*) FROM comments) AS comments
+    """)
+    counts = cursor.fetchone()
+    ticket_count = counts['tickets']
+    file_count = counts['files']
+    comment_count = counts['comments']
     
     print(f"Total Tickets: {ticket_count}")
     print(f"Total Files: {file_count}")
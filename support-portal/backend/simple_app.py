@@ -7,19 +7,37 @@ This version focuses on stability and proper error handling
 import os
 import sys
 import uuid
+import queue
 import base64
 import sqlite3
+import logging
+import threading
+import time
 import traceback
-from datetime import datetime, timezone
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Literal
 from dataclasses import dataclass, asdict
 
 # FastAPI imports
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Depends, Header
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 
+# Handlers log at DEBUG on success, so at the default INFO level the
+# messages are dropped before any formatting. Configured here because the
+# app is launched directly with `uvicorn simple_app:app`.
+logger = logging.getLogger("support_portal.simple_app")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO))
+    logger.propagate = False
+
 # Configuration
 class Config:
     SQLITE_DB_PATH = "support_portal.db"
@@ -31,6 +49,57 @@ class Config:
 # Ensure upload folder exists
 os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
 
+# Applied to every new connection; journal_mode=WAL is persistent and is set
+# once in init_database
+SQLITE_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA busy_timeout=5000;
+    PRAGMA cache_size=-20000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA foreign_keys=ON;
+"""
+
+# SQL statements (module-level so every call hits sqlite3's statement cache)
+# status is left to the column's DEFAULT 'open'
+_SQL_INSERT_TICKET = """
+    INSERT INTO tickets (id, subject, priority, category, description, 
+                         user_id, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+_SQL_SELECT_MY_TICKETS = """
+    SELECT id, subject, priority, category, description, status, 
+           user_id, created_at, attachment_url
+    FROM tickets WHERE user_id = ? ORDER BY created_at DESC
+"""
+
+# Comment counts ride along with the listing so clients don't fetch
+# /tickets/{id}/comments once per ticket
+_SQL_SELECT_MY_TICKETS_WITH_COMMENT_COUNTS = """
+    SELECT t.id, t.subject, t.priority, t.category, t.description, t.status, 
+           t.user_id, t.created_at, t.attachment_url,
+           (SELECT COUNT(*) FROM comments c WHERE c.ticket_id = t.id) AS comment_count
+    FROM tickets t WHERE t.user_id = ? ORDER BY t.created_at DESC
+"""
+
+_SQL_DASHBOARD_METRICS = """
+    SELECT COUNT(*),
+           SUM(status IN ('open', 'in_progress')),
+           SUM(status IN ('resolved', 'closed'))
+    FROM tickets WHERE user_id = ?
+"""
+
+_SQL_SELECT_TICKET_BY_ID = """
+    SELECT id, subject, priority, category, description, status, 
+           user_id, created_at, attachment_url
+    FROM tickets WHERE id = ? AND user_id = ?
+"""
+
+_SQL_SELECT_COMMENTS = """
+    SELECT id, ticket_id, user_id, comment, created_at
+    FROM comments WHERE ticket_id = ? ORDER BY created_at ASC
+"""
+
 # Data Models
 @dataclass
 class Ticket:
@@ -47,26 +116,111 @@ class Ticket:
 # Pydantic models
 class CreateTicketRequest(BaseModel):
     subject: str
-    priority: str
+    # Checked by pydantic-core before the handler runs (422 on anything else)
+    priority: Literal["low", "medium", "high"]
     category: str
     description: str
     attachment: Optional[str] = None
     attachment_name: Optional[str] = None
     attachment_type: Optional[str] = None
 
+class BulkCreateTicketsRequest(BaseModel):
+    tickets: List[CreateTicketRequest]
+
+# Metrics Cache
+# Kept identical to shared.TTLCache: simple_app.py is self-contained and
+# does not import shared.py (its .env loading, S3 setup and log listener)
+class TTLCache:
+    """Small thread-safe LRU cache whose entries expire after `ttl` seconds"""
+    
+    def __init__(self, maxsize: int = 10_000, ttl: float = 5.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+# Connection Pool
+class ConnectionPool:
+    """Fixed set of SQLite connections reused across requests"""
+    
+    def __init__(self, connect, size: int):
+        # LIFO hands out the most recently used (warmest) connection first
+        self.connections = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self.connections.put(connect())
+    
+    @contextmanager
+    def acquire(self):
+        conn = self.connections.get()
+        try:
+            yield conn
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.connections.put(conn)
+    
+    def close(self):
+        while not self.connections.empty():
+            self.connections.get_nowait().close()
+
 # Database Manager
 class DatabaseManager:
     def __init__(self):
         self.db_path = Config.SQLITE_DB_PATH
+        # A single writer serializes INSERTs; readers run in parallel under WAL
+        self.writer = ConnectionPool(self.get_connection, 1)
+        self.readers = ConnectionPool(self.get_connection, os.cpu_count() or 4)
         self.init_database()
     
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        # isolation_level=None: no implicit BEGIN around statements; reads run
+        # in autocommit and writes open their own BEGIN IMMEDIATE
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=256
+        )
+        conn.row_factory = sqlite3.Row
+        conn.executescript(SQLITE_PRAGMAS)
+        return conn
+    
+    def close(self):
+        self.writer.close()
+        self.readers.close()
     
     def init_database(self):
         try:
-            with self.get_connection() as conn:
+            with self.writer.acquire() as conn:
                 cursor = conn.cursor()
+                cursor.execute("PRAGMA journal_mode=WAL")
+                cursor.execute("BEGIN IMMEDIATE")
                 
                 # Tickets table
                 cursor.execute("""
@@ -95,10 +249,31 @@ class DatabaseManager:
                     )
                 """)
                 
-                conn.commit()
-                print("✅ Database initialized")
-        except Exception as e:
-            print(f"❌ Database error: {e}")
+                # Same index names as shared.py, so either app can open the
+                # same database file without creating duplicates
+                cursor.execute("CREATE INDEX IF NOT EXISTS ix_tickets_user_created ON tickets(user_id, created_at DESC)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS ix_tickets_user_status ON tickets(user_id, status)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS ix_comments_ticket_created ON comments(ticket_id, created_at)")
+                
+                cursor.execute("COMMIT")
+                
+                self.analyze_once(conn)
+                logger.info("✅ Database initialized")
+        except Exception:
+            logger.exception("❌ Database error")
+    
+    def analyze_once(self, conn: sqlite3.Connection):
+        """Gather planner statistics the first time the database is set up"""
+        # A full ANALYZE on every process start would have each worker queue
+        # for the write lock; later runs only keep the stats fresh cheaply
+        try:
+            has_stats = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'"
+            ).fetchone()
+            conn.execute("PRAGMA optimize" if has_stats else "ANALYZE")
+        except sqlite3.OperationalError as e:
+            # Statistics are an optimization; a busy database must not stop startup
+            logger.warning("⚠️ Skipped ANALYZE: %s", e)
 
 # Repository
 class TicketRepository:
@@ -107,17 +282,15 @@ class TicketRepository:
     
     def create_ticket(self, subject: str, priority: str, category: str, 
                      description: str, user_id: str) -> Ticket:
-        ticket_id = str(uuid.uuid4())
+        ticket_id = uuid.uuid4().hex
         created_at = datetime.now(timezone.utc).isoformat()
         
-        with self.db.get_connection() as conn:
+        with self.db.writer.acquire() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO tickets (id, subject, priority, category, description, 
-                                   status, user_id, created_at)
-                VALUES (?, ?, ?, ?, ?, 'open', ?, ?)
-            """, (ticket_id, subject, priority, category, description, user_id, created_at))
-            conn.commit()
+            # Take the write lock up front instead of upgrading mid-transaction
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute(_SQL_INSERT_TICKET, (ticket_id, subject, priority, category, description, user_id, created_at))
+            cursor.execute("COMMIT")
         
         return Ticket(
             id=ticket_id,
@@ -130,50 +303,71 @@ class TicketRepository:
             created_at=created_at
         )
     
+    def create_tickets_bulk(self, tickets: List[Dict[str, str]], user_id: str) -> List[Ticket]:
+        """Insert several tickets in a single transaction"""
+        # One microsecond apart so ORDER BY created_at keeps submission order
+        base = datetime.now(timezone.utc)
+        created = [
+            Ticket(
+                id=uuid.uuid4().hex,
+                subject=t['subject'],
+                priority=t['priority'],
+                category=t['category'],
+                description=t['description'],
+                status='open',
+                user_id=user_id,
+                created_at=(base + timedelta(microseconds=i)).isoformat()
+            )
+            for i, t in enumerate(tickets)
+        ]
+        rows = [
+            (t.id, t.subject, t.priority, t.category, t.description, t.user_id, t.created_at)
+            for t in created
+        ]
+        
+        # One BEGIN IMMEDIATE ... COMMIT (and one WAL sync) for the whole batch
+        with self.db.writer.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.executemany(_SQL_INSERT_TICKET, rows)
+            cursor.execute("COMMIT")
+        
+        return created
+    
     def get_my_tickets(self, user_id: str) -> List[Dict]:
-        with self.db.get_connection() as conn:
+        with self.db.readers.acquire() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, subject, priority, category, description, status, 
-                       user_id, created_at, attachment_url
-                FROM tickets WHERE user_id = ? ORDER BY created_at DESC
-            """, (user_id,))
+            cursor.execute(_SQL_SELECT_MY_TICKETS, (user_id,))
             
-            tickets = []
-            for row in cursor.fetchall():
-                tickets.append({
-                    'id': row[0],
-                    'subject': row[1],
-                    'priority': row[2],
-                    'category': row[3],
-                    'description': row[4],
-                    'status': row[5],
-                    'user_id': row[6],
-                    'created_at': row[7],
-                    'attachment_url': row[8]
-                })
-            return tickets
+            return [dict(row) for row in cursor]
     
-    def get_dashboard_metrics(self, user_id: str) -> Dict[str, int]:
-        with self.db.get_connection() as conn:
+    def get_my_tickets_with_comment_counts(self, user_id: str) -> List[Dict]:
+        with self.db.readers.acquire() as conn:
             cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_MY_TICKETS_WITH_COMMENT_COUNTS, (user_id,))
             
-            # Total tickets
-            cursor.execute("SELECT COUNT(*) FROM tickets WHERE user_id = ?", (user_id,))
-            total = cursor.fetchone()[0]
+            return [dict(row) for row in cursor]
+    
+    def get_ticket(self, ticket_id: str, user_id: str) -> Optional[Dict]:
+        with self.db.readers.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_TICKET_BY_ID, (ticket_id, user_id))
             
-            # Open tickets  
-            cursor.execute("SELECT COUNT(*) FROM tickets WHERE user_id = ? AND status IN ('open', 'in_progress')", (user_id,))
-            open_tickets = cursor.fetchone()[0]
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_dashboard_metrics(self, user_id: str) -> Dict[str, int]:
+        with self.db.readers.acquire() as conn:
+            cursor = conn.cursor()
             
-            # Resolved tickets
-            cursor.execute("SELECT COUNT(*) FROM tickets WHERE user_id = ? AND status IN ('resolved', 'closed')", (user_id,))
-            resolved = cursor.fetchone()[0]
+            # One pass over the user's rows instead of three COUNT(*) scans
+            cursor.execute(_SQL_DASHBOARD_METRICS, (user_id,))
+            row = cursor.fetchone()
             
             return {
-                'total': total,
-                'open': open_tickets, 
-                'resolved': resolved
+                'total': row[0],
+                'open': row[1] or 0,
+                'resolved': row[2] or 0
             }
 
 class CommentRepository:
@@ -181,34 +375,33 @@ class CommentRepository:
         self.db = db_manager
     
     def get_comments_for_ticket(self, ticket_id: str) -> List[Dict]:
-        with self.db.get_connection() as conn:
+        with self.db.readers.acquire() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, ticket_id, user_id, comment, created_at
-                FROM comments WHERE ticket_id = ? ORDER BY created_at ASC
-            """, (ticket_id,))
+            cursor.execute(_SQL_SELECT_COMMENTS, (ticket_id,))
             
-            comments = []
-            for row in cursor.fetchall():
-                comments.append({
-                    'id': row[0],
-                    'ticket_id': row[1],
-                    'user_id': row[2],
-                    'comment': row[3],
-                    'created_at': row[4]
-                })
-            return comments
+            return [dict(row) for row in cursor]
 
 # Initialize
 db_manager = DatabaseManager()
 ticket_repo = TicketRepository(db_manager)
 comment_repo = CommentRepository(db_manager)
 
+# Per-user dashboard counts absorb burst refreshes; dropped on every create
+metrics_cache = TTLCache(maxsize=10_000, ttl=2.0)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    db_manager.close()
+
 # FastAPI app
 app = FastAPI(
     title="Support Portal API",
     version="1.0.0",
-    docs_url="/docs"
+    docs_url="/docs",
+    lifespan=lifespan,
+    # orjson serializes the ticket/comment lists far faster than json.dumps
+    default_response_class=ORJSONResponse
 )
 
 # CORS
@@ -221,9 +414,9 @@ app.add_middleware(
 )
 
 # Helper functions
-def get_user_id(request: Request) -> str:
-    user_id = request.headers.get("X-User-Id") or Config.DEFAULT_USER_ID
-    return user_id
+def get_user_id(x_user_id: Optional[str] = Header(default=None)) -> str:
+    """X-User-Id header, resolved once per request via Depends()"""
+    return x_user_id or Config.DEFAULT_USER_ID
 
 # Routes
 @app.get("/")
@@ -235,15 +428,10 @@ def health_check():
     return {"status": "ok", "timestamp": datetime.now(timezone.utc).isoformat()}
 
 @app.post("/tickets")
-async def create_ticket(request: Request, ticket_data: CreateTicketRequest):
+async def create_ticket(ticket_data: CreateTicketRequest, user_id: str = Depends(get_user_id)):
     try:
-        user_id = get_user_id(request)
-        
-        # Validate priority
-        if ticket_data.priority not in ["low", "medium", "high"]:
-            raise HTTPException(status_code=400, detail="Invalid priority")
-        
-        ticket = ticket_repo.create_ticket(
+        ticket = await run_in_threadpool(
+            ticket_repo.create_ticket,
             subject=ticket_data.subject,
             priority=ticket_data.priority,
             category=ticket_data.category,
@@ -251,90 +439,92 @@ async def create_ticket(request: Request, ticket_data: CreateTicketRequest):
             user_id=user_id
         )
         
-        print(f"✅ Ticket created: {ticket.id}")
+        metrics_cache.delete(user_id)
+        logger.debug("✅ Ticket created: %s", ticket.id)
         return {"ticket": asdict(ticket)}
         
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Create ticket error: {e}")
+    except Exception:
+        logger.exception("❌ Create ticket error")
         raise HTTPException(status_code=500, detail="Failed to create ticket")
 
+@app.post("/tickets/bulk")
+async def create_tickets_bulk(bulk_data: BulkCreateTicketsRequest, user_id: str = Depends(get_user_id)):
+    try:
+        tickets = await run_in_threadpool(
+            ticket_repo.create_tickets_bulk,
+            [ticket_data.model_dump() for ticket_data in bulk_data.tickets],
+            user_id=user_id
+        )
+        
+        metrics_cache.delete(user_id)
+        logger.debug("✅ Bulk created %s tickets for %s", len(tickets), user_id)
+        return {"tickets": [asdict(ticket) for ticket in tickets]}
+        
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("❌ Bulk create tickets error")
+        raise HTTPException(status_code=500, detail="Failed to create tickets")
+
 @app.get("/tickets/my")
-async def get_my_tickets(request: Request):
+async def get_my_tickets(include_comment_counts: bool = False, user_id: str = Depends(get_user_id)):
     try:
-        user_id = get_user_id(request)
-        tickets = ticket_repo.get_my_tickets(user_id)
-        print(f"✅ Fetched {len(tickets)} tickets for {user_id}")
+        if include_comment_counts:
+            tickets = await run_in_threadpool(ticket_repo.get_my_tickets_with_comment_counts, user_id)
+        else:
+            tickets = await run_in_threadpool(ticket_repo.get_my_tickets, user_id)
+        logger.debug("✅ Fetched %s tickets for %s", len(tickets), user_id)
         return {"tickets": tickets}
         
-    except Exception as e:
-        print(f"❌ Get tickets error: {e}")
+    except Exception:
+        logger.exception("❌ Get tickets error")
         raise HTTPException(status_code=500, detail="Failed to fetch tickets")
 
 @app.get("/tickets/{ticket_id}")
-async def get_ticket(ticket_id: str, request: Request):
+async def get_ticket(ticket_id: str, user_id: str = Depends(get_user_id)):
     try:
-        user_id = get_user_id(request)
+        ticket = await run_in_threadpool(ticket_repo.get_ticket, ticket_id, user_id)
+        if not ticket:
+            raise HTTPException(status_code=404, detail="Ticket not found")
         
-        with db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, subject, priority, category, description, status, 
-                       user_id, created_at, attachment_url
-                FROM tickets WHERE id = ? AND user_id = ?
-            """, (ticket_id, user_id))
-            
-            row = cursor.fetchone()
-            if not row:
-                raise HTTPException(status_code=404, detail="Ticket not found")
-            
-            ticket = {
-                'id': row[0],
-                'subject': row[1],
-                'priority': row[2],
-                'category': row[3],
-                'description': row[4],
-                'status': row[5],
-                'user_id': row[6],
-                'created_at': row[7],
-                'attachment_url': row[8]
-            }
-            
-            return {"ticket": ticket}
+        return {"ticket": ticket}
         
     except HTTPException:
         raise
-    except Exception as e:
-        print(f"❌ Get ticket error: {e}")
+    except Exception:
+        logger.exception("❌ Get ticket error")
         raise HTTPException(status_code=500, detail="Failed to fetch ticket")
 
 @app.get("/tickets/{ticket_id}/comments")
 async def get_ticket_comments(ticket_id: str):
     try:
-        comments = comment_repo.get_comments_for_ticket(ticket_id)
+        comments = await run_in_threadpool(comment_repo.get_comments_for_ticket, ticket_id)
         return {"comments": comments}
         
-    except Exception as e:
-        print(f"❌ Get comments error: {e}")
+    except Exception:
+        logger.exception("❌ Get comments error")
         raise HTTPException(status_code=500, detail="Failed to fetch comments")
 
 @app.get("/dashboard/metrics")
-async def get_dashboard_metrics(request: Request):
+async def get_dashboard_metrics(user_id: str = Depends(get_user_id)):
     try:
-        user_id = get_user_id(request)
-        metrics = ticket_repo.get_dashboard_metrics(user_id)
-        print(f"✅ Metrics for {user_id}: {metrics}")
+        metrics = metrics_cache.get(user_id)
+        if metrics is None:
+            metrics = await run_in_threadpool(ticket_repo.get_dashboard_metrics, user_id)
+            metrics_cache.set(user_id, metrics)
+        logger.debug("✅ Metrics for %s: %s", user_id, metrics)
         return {"metrics": metrics}
         
-    except Exception as e:
-        print(f"❌ Get metrics error: {e}")
+    except Exception:
+        logger.exception("❌ Get metrics error")
         raise HTTPException(status_code=500, detail="Failed to fetch metrics")
 
 # Error handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
-    print(f"❌ Unhandled error: {exc}")
+    logger.error("❌ Unhandled error: %s", exc, exc_info=exc)
     return JSONResponse(
         status_code=500,
         content={"error": "Internal server error", "detail": str(exc)}
@@ -4,8 +4,26 @@ Simple startup script for the Support Portal Backend
 This avoids import conflicts when using uvicorn directly
 """
 
+import os
+
 import uvicorn
 
+# Faster event loop and HTTP parser (installed by uvicorn[standard])
+try:
+    import uvloop
+    HAS_UVLOOP = True
+except ImportError:
+    HAS_UVLOOP = False  # not available on Windows
+
+try:
+    import httptools
+    HAS_HTTPTOOLS = True
+except ImportError:
+    HAS_HTTPTOOLS = False
+
+# Same switch as Config.DEBUG: reload for development, worker processes otherwise
+DEBUG = os.getenv("DEBUG", "true").lower() == "true"
+
 if __name__ == "__main__":
     print("🚀 Starting Support Portal API")
     print("=" * 50)
@@ -16,10 +34,16 @@ if __name__ == "__main__":
     print("🏠 File Storage: Local only")
     print("=" * 50)
     
+    # uvicorn cannot combine reload with multiple worker processes
+    workers = 1 if DEBUG else os.cpu_count() or 1
+    
     uvicorn.run(
         "app:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
-        log_level="info"
+        reload=DEBUG,
+        workers=workers,
+        loop="uvloop" if HAS_UVLOOP else "asyncio",
+        http="httptools" if HAS_HTTPTOOLS else "h11",
+        log_level="info" if DEBUG else "warning"
     )
\ No newline at end of file
@@ -0,0 +1,58 @@
+"""
+Comment endpoint tests for app.py
+
+    python -m unittest discover -s tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class CreateCommentTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Config reads its paths at import time, so point them at a scratch
+        # directory before app.py is imported
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.cwd = os.getcwd()
+        os.chdir(cls.tmp.name)
+        os.environ["SQLITE_DB_PATH"] = os.path.join(cls.tmp.name, "test.db")
+        os.environ["UPLOAD_FOLDER"] = os.path.join(cls.tmp.name, "uploads")
+        sys.path.insert(0, BACKEND_DIR)
+
+        from fastapi.testclient import TestClient
+        import app
+        cls.client = TestClient(app.app)
+
+    @classmethod
+    def tearDownClass(cls):
+        os.chdir(cls.cwd)
+
+    def create_ticket(self):
+        response = self.client.post("/tickets", json={
+            "subject": "Printer offline",
+            "priority": "low",
+            "category": "hardware",
+            "description": "The 3rd floor printer does not respond",
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()["ticket"]["id"]
+
+    def test_comment_on_existing_ticket(self):
+        ticket_id = self.create_ticket()
+        response = self.client.post(f"/tickets/{ticket_id}/comments", json={"comment": "On it"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["comment"]["ticket_id"], ticket_id)
+
+    def test_comment_on_unknown_ticket_is_404(self):
+        response = self.client.post("/tickets/does-not-exist/comments", json={"comment": "Hello?"})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["detail"], "Ticket not found")
+
+
+if __name__ == "__main__":
+    unittest.main()
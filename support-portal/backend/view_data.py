@@ -1,24 +1,48 @@
 import sqlite3
-import pandas as pd
+
+MAX_COLWIDTH = 50
+BATCH_SIZE = 1000
+
+def _cell(value, width):
+    text = "" if value is None else str(value).replace("\n", " ")
+    if len(text) > width:
+        text = text[:width - 3] + "..."
+    return text.ljust(width)
+
+def print_table(cursor, sql):
+    """Print a query result as an aligned text table, one batch at a time
+
+    Column widths come from the header and the first batch (capped at
+    MAX_COLWIDTH), so rows are never all held in memory at once.
+    """
+    cursor.execute(sql)
+    columns = [col[0] for col in cursor.description]
+    rows = cursor.fetchmany(BATCH_SIZE)
+    if not rows:
+        return False
+    
+    widths = [
+        min(MAX_COLWIDTH, max([len(name)] + [len(str(row[i])) for row in rows]))
+        for i, name in enumerate(columns)
+    ]
+    print("  ".join(_cell(name, widths[i]) for i, name in enumerate(columns)).rstrip())
+    while rows:
+        for row in rows:
+            print("  ".join(_cell(value, widths[i]) for i, value in enumerate(row)).rstrip())
+        rows = cursor.fetchmany(BATCH_SIZE)
+    return True
 
 def view_all_data():
     """Display all data in a readable format"""
     
     conn = sqlite3.connect('support_portal.db')
+    cursor = conn.cursor()
     
     print("🎫 TICKETS:")
     print("=" * 80)
     
-    # Read tickets into a pandas DataFrame for better display
     try:
-        df_tickets = pd.read_sql_query("SELECT * FROM tickets ORDER BY created_at DESC", conn)
-        if not df_tickets.empty:
-            # Display with better formatting
-            pd.set_option('display.max_columns', None)
-            pd.set_option('display.width', None)
-            pd.set_option('display.max_colwidth', 50)
-            print(df_tickets.to_string(index=False))
-        else:
+        if not print_table(cursor, "SELECT * FROM tickets ORDER BY created_at DESC"):
             print("No tickets found")
     except Exception as e:
         print(f"Error reading tickets: {e}")
@@ -27,10 +51,7 @@ def view_all_data():
     print("=" * 80)
     
     try:
-        df_files = pd.read_sql_query("SELECT * FROM ticket_files", conn)
-        if not df_files.empty:
-            print(df_files.to_string(index=False))
-        else:
+        if not print_table(cursor, "SELECT * FROM ticket_files"):
             print("No files found")
     except Exception as e:
         print(f"Error reading files: {e}")
@@ -39,10 +60,7 @@ def view_all_data():
     print("=" * 80)
     
     try:
-        df_comments = pd.read_sql_query("SELECT * FROM comments", conn)
-        if not df_comments.empty:
-            print(df_comments.to_string(index=False))
-        else:
+        if not print_table(cursor, "SELECT * FROM comments"):
             print("No comments found")
     except Exception as e:
         print(f"Error reading comments: {e}")
@@ -50,11 +68,4 @@ def view_all_data():
     conn.close()
 
 if __name__ == "__main__":
-    try:
-        view_all_data()
-    except ImportError:
-        print("pandas not installed. Installing...")
-        import subprocess
-        subprocess.check_call(['pip', 'install', 'pandas'])
-        import pandas as pd
-        view_all_data()
\ No newline at end of file
+    view_all_data()